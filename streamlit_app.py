@@ -1,350 +1,620 @@
+import html
+import numpy as np
 import streamlit as st
-from typing import Dict, List, Tuple
+from dataclasses import dataclass
+from enum import IntEnum
+from pathlib import Path
+from typing import Callable, Dict, FrozenSet, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Tuple, Union
 
 # =========================
 # Data: DMT class metadata
 # =========================
 
-DMT_CLASSES: Dict[str, Dict] = {
-    "anti_cd20": {
-        "name": "Anti-CD20 monoclonal antibodies (ocrelizumab, ofatumumab, rituximab off-label)",
-        "efficacy_tier": "high",
-        "routes": ["IV infusion every 6 months", "SC injection monthly (ofatumumab)"],
-        "tags": {"high_efficacy", "infusion", "sc", "long_interval", "blunts_vaccines"},
-        "pregnancy_strategy": "short_course_before_preg",
-        "moa": (
+# Tag bits combined into DMT.tag_mask
+LONG_INTERVAL = 1 << 0
+IMMUNE_RECON = 1 << 1
+HIGH_FREQ = 1 << 2
+INFUSION = 1 << 3
+ORAL = 1 << 4
+BLUNTS_VACC = 1 << 5
+VACCINE_FRIENDLY = 1 << 6
+REBOUND = 1 << 7
+HIGH_EFFICACY = 1 << 8
+MODERATE_EFFICACY = 1 << 9
+PLATFORM = 1 << 10
+INJECTABLE = 1 << 11
+SC = 1 << 12
+INTENSE_MONITORING = 1 << 13
+
+
+@dataclass(frozen=True, slots=True)
+class DMT:
+    """Metadata for one DMT class."""
+    name: str
+    efficacy_tier: str  # 'high', 'moderate_high', 'moderate' or 'platform'
+    routes: Tuple[str, ...]
+    tag_mask: int
+    pregnancy_strategy: str  # 'compatible', 'short_course_before_preg', 'caution', 'needs_long_washout' or 'avoid'
+    moa: str
+    arr_reduction: str
+    key_risks: str
+
+
+DMT_CLASSES: Dict[str, DMT] = {
+    "anti_cd20": DMT(
+        name="Anti-CD20 monoclonal antibodies (ocrelizumab, ofatumumab, rituximab off-label)",
+        efficacy_tier="high",
+        routes=("IV infusion every 6 months", "SC injection monthly (ofatumumab)"),
+        tag_mask=HIGH_EFFICACY | INFUSION | SC | LONG_INTERVAL | BLUNTS_VACC,
+        pregnancy_strategy="short_course_before_preg",
+        moa=(
             "CD20 B-cell depletion leading to reduced antigen presentation, cytokine production, "
             "and ectopic follicle formation with strong suppression of new inflammatory activity."
         ),
-        "arr_reduction": "≈45–60% vs active comparators; ≈70% vs teriflunomide in some trials.",
-        "key_risks": (
+        arr_reduction="≈45–60% vs active comparators; ≈70% vs teriflunomide in some trials.",
+        key_risks=(
             "Infusion or injection reactions; infections (especially respiratory and herpes zoster); "
             "hypogammaglobulinemia with prolonged use; rare PML; possible malignancy signal in some datasets."
         ),
-    },
-    "natalizumab": {
-        "name": "Natalizumab",
-        "efficacy_tier": "high",
-        "routes": ["IV infusion every 4 weeks (can be extended to 6–8 weeks)"],
-        "tags": {"high_efficacy", "infusion", "rebound_risk", "vaccine_friendly"},
-        "pregnancy_strategy": "short_course_before_preg",
-        "moa": (
+    ),
+    "natalizumab": DMT(
+        name="Natalizumab",
+        efficacy_tier="high",
+        routes=("IV infusion every 4 weeks (can be extended to 6–8 weeks)",),
+        tag_mask=HIGH_EFFICACY | INFUSION | REBOUND | VACCINE_FRIENDLY,
+        pregnancy_strategy="short_course_before_preg",
+        moa=(
             "Humanized monoclonal antibody against α4-integrin that blocks lymphocyte adhesion and "
             "migration across the blood–brain barrier."
         ),
-        "arr_reduction": "≈65–70% vs placebo; ≈40–50% reduction in disability progression.",
-        "key_risks": (
+        arr_reduction="≈65–70% vs placebo; ≈40–50% reduction in disability progression.",
+        key_risks=(
             "Progressive multifocal leukoencephalopathy (PML) risk strongly linked to JCV index, prior "
             "immunosuppression, and treatment duration; infusion reactions; rebound disease on abrupt discontinuation."
         ),
-    },
-    "alemtuzumab": {
-        "name": "Alemtuzumab",
-        "efficacy_tier": "high",
-        "routes": ["IV infusion in 2 annual courses (5 then 3 days)"],
-        "tags": {"high_efficacy", "infusion", "immune_reconstitution", "intense_monitoring"},
-        "pregnancy_strategy": "needs_long_washout",
-        "moa": (
+    ),
+    "alemtuzumab": DMT(
+        name="Alemtuzumab",
+        efficacy_tier="high",
+        routes=("IV infusion in 2 annual courses (5 then 3 days)",),
+        tag_mask=HIGH_EFFICACY | INFUSION | IMMUNE_RECON | INTENSE_MONITORING,
+        pregnancy_strategy="needs_long_washout",
+        moa=(
             "Monoclonal antibody against CD52 causing profound but transient depletion of T and B lymphocytes, "
             "followed by gradual immune reconstitution ('immune reset')."
         ),
-        "arr_reduction": "≈70–75% vs interferon beta; durable relapse suppression in many patients.",
-        "key_risks": (
+        arr_reduction="≈70–75% vs interferon beta; durable relapse suppression in many patients.",
+        key_risks=(
             "Autoimmune thyroid disease (~30–40%), immune thrombocytopenia, rare anti-GBM nephropathy; "
             "infections and possible malignancy risk; requires monthly labs for at least 4 years after last dose."
         ),
-    },
-    "cladribine": {
-        "name": "Cladribine tablets",
-        "efficacy_tier": "high",
-        "routes": ["Short oral courses in year 1 and year 2 (immune reconstitution)"],
-        "tags": {"high_efficacy", "oral", "immune_reconstitution", "long_interval", "vaccine_friendly"},
-        "pregnancy_strategy": "short_course_before_preg",
-        "moa": (
+    ),
+    "cladribine": DMT(
+        name="Cladribine tablets",
+        efficacy_tier="high",
+        routes=("Short oral courses in year 1 and year 2 (immune reconstitution)",),
+        tag_mask=HIGH_EFFICACY | ORAL | IMMUNE_RECON | LONG_INTERVAL | VACCINE_FRIENDLY,
+        pregnancy_strategy="short_course_before_preg",
+        moa=(
             "Purine nucleoside analogue preferentially taken up by lymphocytes, causing apoptosis of B and T cells "
             "with relative sparing of innate immunity; classified as an immune reconstitution therapy."
         ),
-        "arr_reduction": "≈55–60% vs placebo; reduced disability progression in pivotal trials.",
-        "key_risks": (
+        arr_reduction="≈55–60% vs placebo; reduced disability progression in pivotal trials.",
+        key_risks=(
             "Lymphopenia (grade 3–4 common), herpes zoster reactivation, possible malignancy risk although "
             "overall rates approximate background in newer analyses."
         ),
-    },
-    "s1p_modulators": {
-        "name": "S1P receptor modulators (fingolimod, siponimod, ozanimod, ponesimod)",
-        "efficacy_tier": "moderate_high",
-        "routes": ["Daily oral therapy"],
-        "tags": {"oral", "high_efficacy", "high_freq", "rebound_risk", "blunts_vaccines"},
-        "pregnancy_strategy": "needs_long_washout",
-        "moa": (
+    ),
+    "s1p_modulators": DMT(
+        name="S1P receptor modulators (fingolimod, siponimod, ozanimod, ponesimod)",
+        efficacy_tier="moderate_high",
+        routes=("Daily oral therapy",),
+        tag_mask=ORAL | HIGH_EFFICACY | HIGH_FREQ | REBOUND | BLUNTS_VACC,
+        pregnancy_strategy="needs_long_washout",
+        moa=(
             "Functional antagonists of S1P1 on lymphocytes leading to sequestration in lymph nodes and reduced "
             "egress into the circulation and CNS."
         ),
-        "arr_reduction": "≈50–55% vs placebo and ≈50% vs interferon beta in some trials.",
-        "key_risks": (
+        arr_reduction="≈50–55% vs placebo and ≈50% vs interferon beta in some trials.",
+        key_risks=(
             "Bradycardia and AV conduction delay at initiation; hypertension; macular oedema; elevated LFTs; "
             "infections including varicella zoster; rare PML; significant rebound risk on abrupt discontinuation."
         ),
-    },
-    "fumarates": {
-        "name": "Fumarates (dimethyl/diroximel fumarate)",
-        "efficacy_tier": "moderate",
-        "routes": ["Oral twice daily therapy"],
-        "tags": {"oral", "moderate_efficacy", "high_freq", "vaccine_friendly"},
-        "pregnancy_strategy": "caution",
-        "moa": (
+    ),
+    "fumarates": DMT(
+        name="Fumarates (dimethyl/diroximel fumarate)",
+        efficacy_tier="moderate",
+        routes=("Oral twice daily therapy",),
+        tag_mask=ORAL | MODERATE_EFFICACY | HIGH_FREQ | VACCINE_FRIENDLY,
+        pregnancy_strategy="caution",
+        moa=(
             "Thought to activate the Nrf2 antioxidant pathway and exert broad anti-inflammatory and "
             "neuroprotective effects."
         ),
-        "arr_reduction": "≈40–45% vs placebo in pivotal trials.",
-        "key_risks": (
+        arr_reduction="≈40–45% vs placebo in pivotal trials.",
+        key_risks=(
             "Flushing and gastrointestinal symptoms; lymphopenia with long-term use; rare PML cases reported."
         ),
-    },
-    "teriflunomide": {
-        "name": "Teriflunomide",
-        "efficacy_tier": "moderate",
-        "routes": ["Oral once-daily therapy"],
-        "tags": {"oral", "moderate_efficacy", "high_freq"},
-        "pregnancy_strategy": "avoid",
-        "moa": (
+    ),
+    "teriflunomide": DMT(
+        name="Teriflunomide",
+        efficacy_tier="moderate",
+        routes=("Oral once-daily therapy",),
+        tag_mask=ORAL | MODERATE_EFFICACY | HIGH_FREQ,
+        pregnancy_strategy="avoid",
+        moa=(
             "Inhibits dihydroorotate dehydrogenase and de novo pyrimidine synthesis in rapidly dividing T and B cells, "
             "reducing their proliferation."
         ),
-        "arr_reduction": "≈30–32% vs placebo.",
-        "key_risks": (
+        arr_reduction="≈30–32% vs placebo.",
+        key_risks=(
             "Hepatotoxicity requiring regular LFT monitoring; teratogenicity with very long elimination half-life; "
             "alopecia and gastrointestinal side effects."
         ),
-    },
-    "platform_injectables": {
-        "name": "Platform injectables (interferon beta preparations and glatiramer acetate)",
-        "efficacy_tier": "platform",
-        "routes": ["SC/IM injections from daily to weekly depending on preparation"],
-        "tags": {"injectable", "platform", "high_freq", "vaccine_friendly"},
-        "pregnancy_strategy": "compatible",
-        "moa": (
+    ),
+    "platform_injectables": DMT(
+        name="Platform injectables (interferon beta preparations and glatiramer acetate)",
+        efficacy_tier="platform",
+        routes=("SC/IM injections from daily to weekly depending on preparation",),
+        tag_mask=INJECTABLE | PLATFORM | HIGH_FREQ | VACCINE_FRIENDLY,
+        pregnancy_strategy="compatible",
+        moa=(
             "Broad immunomodulation including shifts toward anti-inflammatory cytokine profiles and reduced "
             "T-cell trafficking across the blood–brain barrier."
         ),
-        "arr_reduction": "≈30% vs placebo.",
-        "key_risks": (
+        arr_reduction="≈30% vs placebo.",
+        key_risks=(
             "Injection site reactions and lipoatrophy (GA); flu-like symptoms, depression risk, and laboratory "
             "abnormalities (IFN beta)."
         ),
-    },
+    ),
 }
 
+# =====================================
+# Static encodings derived from classes
+# =====================================
+
+# Efficacy tiers, ordered from most to least effective
+TIER_HIGH, TIER_MOD_HIGH, TIER_MODERATE, TIER_PLATFORM = range(4)
+TIER_CODES: Dict[str, int] = {
+    "high": TIER_HIGH,
+    "moderate_high": TIER_MOD_HIGH,
+    "moderate": TIER_MODERATE,
+    "platform": TIER_PLATFORM,
+}
+
+PREG_COMPATIBLE, PREG_SHORT_COURSE, PREG_CAUTION, PREG_LONG_WASHOUT, PREG_AVOID = range(5)
+PREG_CODES: Dict[str, int] = {
+    "compatible": PREG_COMPATIBLE,
+    "short_course_before_preg": PREG_SHORT_COURSE,
+    "caution": PREG_CAUTION,
+    "needs_long_washout": PREG_LONG_WASHOUT,
+    "avoid": PREG_AVOID,
+}
+
+# ==========================
+# Canned rationale notes
+# ==========================
+
+class Note(IntEnum):
+    """Rationale note IDs, declared in the order the scoring pipeline can append them."""
+    HIGH_RISK_HE = 0
+    HIGH_RISK_LOWER_EFF = 1
+    MAX_PREF_HE = 2
+    MAX_PREF_LOWER_EFF = 3
+    BALANCED_HE = 4
+    BALANCED_LOWER_EFF = 5
+    SAFETY_HE = 6
+    SAFETY_LOWER_EFF = 7
+    PREG_SOON_COMPATIBLE = 8
+    PREG_LATER_COMPATIBLE = 9
+    PREG_LATER_SHORT_COURSE = 10
+    PREG_LATER_CAUTION = 11
+    PREG_LATER_WASHOUT = 12
+    RENAL = 13
+    MALIGNANCY = 14
+    INFECTION_RISK = 15
+    GI_DOMINANT = 16
+    PSYCHIATRIC = 17
+    ADHERENCE_LONG_INTERVAL = 18
+    ADHERENCE_HIGH_FREQ = 19
+    ORAL_ONLY = 20
+    NO_INFUSION = 21
+    INFREQUENT_LONG_INTERVAL = 22
+    INFREQUENT_HIGH_FREQ = 23
+    LIMITED_INFUSION_ACCESS = 24
+    TIME_OFF_WORK = 25
+    UNSTABLE_INSURANCE = 26
+    VACCINE_BLUNTS = 27
+    VACCINE_FRIENDLY = 28
+    FORCED_STOP_REBOUND = 29
+    FORCED_STOP_SMOOTH_EXIT = 30
+
+
+_NOTE_TEXT_BY_ID: Dict[Note, str] = {
+    Note.HIGH_RISK_HE: "High-risk disease: high-efficacy or moderate-high-efficacy class is preferred.",
+    Note.HIGH_RISK_LOWER_EFF: "High-risk disease: platform/moderate efficacy likely insufficient except when higher-efficacy options are unsafe.",
+    Note.MAX_PREF_HE: "Patient prefers maximal long-term efficacy; this class fits that stance.",
+    Note.MAX_PREF_LOWER_EFF: "Moderate/platform efficacy despite maximal-efficacy preference.",
+    Note.BALANCED_HE: "Balanced view: high efficacy acceptable with monitoring.",
+    Note.BALANCED_LOWER_EFF: "Balanced view: moderate/platform efficacy acceptable.",
+    Note.SAFETY_HE: "Safety-first stance: high-efficacy agent used only if other factors strongly favour it.",
+    Note.SAFETY_LOWER_EFF: "Safety-first stance: platform/moderate efficacy aligns with risk aversion.",
+    Note.PREG_SOON_COMPATIBLE: "Pregnancy planned in ≤6 months: this class is relatively compatible with conception/pregnancy.",
+    Note.PREG_LATER_COMPATIBLE: "Pregnancy in 6–24 months: relatively safe through conception.",
+    Note.PREG_LATER_SHORT_COURSE: "Pregnancy in 6–24 months: can be used as short-course or with timed last dose before conception.",
+    Note.PREG_LATER_CAUTION: "Pregnancy in 6–24 months: limited but growing data; typically not first-line in this setting.",
+    Note.PREG_LATER_WASHOUT: "Pregnancy in 6–24 months: long washout or teratogenicity makes this less attractive.",
+    Note.RENAL: "Renal impairment: fumarates have limited data and may be less attractive.",
+    Note.MALIGNANCY: "History of malignancy: consider carefully; balance immunosuppression against cancer risk.",
+    Note.INFECTION_RISK: "High infection risk: deep or prolonged immunosuppression is less attractive.",
+    Note.GI_DOMINANT: "Prominent baseline GI symptoms: this class is often GI-limited and may be poorly tolerated.",
+    Note.PSYCHIATRIC: "Severe depression or suicidality: interferon-associated mood effects make this less attractive.",
+    Note.ADHERENCE_LONG_INTERVAL: "High adherence risk: long-interval or immune-reconstitution regimen is a good fit.",
+    Note.ADHERENCE_HIGH_FREQ: "High adherence risk: frequent dosing may be problematic.",
+    Note.ORAL_ONLY: "Oral-only preference: this class is oral.",
+    Note.NO_INFUSION: "Patient wishes to avoid infusions; this class is infusion-based.",
+    Note.INFREQUENT_LONG_INTERVAL: "Prefers infrequent dosing: long-interval or immune-reconstitution class fits well.",
+    Note.INFREQUENT_HIGH_FREQ: "Prefers infrequent dosing: daily or frequent dosing less attractive.",
+    Note.LIMITED_INFUSION_ACCESS: "Limited infusion access: hospital-based infusions are logistically difficult.",
+    Note.TIME_OFF_WORK: "Difficulty taking time off work: prolonged infusions are less convenient.",
+    Note.UNSTABLE_INSURANCE: "Unstable insurance: very high-cost biologics may be at risk if coverage changes.",
+    Note.VACCINE_BLUNTS: "High vaccine-priority: this class markedly blunts humoral vaccine responses.",
+    Note.VACCINE_FRIENDLY: "High vaccine-priority: this class generally preserves vaccine responses.",
+    Note.FORCED_STOP_REBOUND: "High likelihood of forced discontinuation: rebound risk makes this class unattractive.",
+    Note.FORCED_STOP_SMOOTH_EXIT: "High likelihood of forced discontinuation: this class usually has a smoother exit strategy.",
+}
+_NOTE_TEXT: Tuple[str, ...] = tuple(_NOTE_TEXT_BY_ID[note] for note in Note)
+
+# Bit per note for the per-class uint64 note sets (bit order == Note order == display order)
+_NOTE_BITS: Tuple[np.uint64, ...] = tuple(np.uint64(1) << np.uint64(note) for note in Note)
+
+
+def _note_text(bits: int) -> str:
+    """Join the texts of every note whose bit is set, in Note order."""
+    return " ".join(_NOTE_TEXT[note] for note in range(len(_NOTE_TEXT)) if bits >> note & 1)
+
+
+class Reason(IntEnum):
+    """Exclusion reason IDs; -1 in an excluded_reason array means 'not excluded'."""
+    PREG_SOON = 0
+    CARDIAC_S1P = 1
+    HEPATIC_TERIFLUNOMIDE = 2
+    AUTOIMMUNE_ALEMTUZUMAB = 3
+    NOT_ORAL = 4
+
+
+_REASON_TEXT_BY_ID: Dict[Reason, str] = {
+    Reason.PREG_SOON: "Pregnancy planned in ≤6 months: not advisable because safe washout is not feasible or data are insufficient.",
+    Reason.CARDIAC_S1P: "Cardiac disease or conduction abnormalities: S1P modulators are relatively contraindicated.",
+    Reason.HEPATIC_TERIFLUNOMIDE: "Significant hepatic disease: teriflunomide carries hepatotoxicity risk.",
+    Reason.AUTOIMMUNE_ALEMTUZUMAB: "Pre-existing autoimmune diathesis: avoid alemtuzumab because of high autoimmune complication rates.",
+    Reason.NOT_ORAL: "Patient prefers oral-only therapy; this class is not oral.",
+}
+_REASON_TEXT: Tuple[str, ...] = tuple(_REASON_TEXT_BY_ID[reason] for reason in Reason)
+
+
 # ===========================================
 # Utility: scoring helpers for initial RRMS
 # ===========================================
 
-def score_activity_and_efficacy(
-    risk_level: str,
-    efficacy_preference: str,
-    scores: Dict[str, float],
-    notes: Dict[str, List[str]],
-) -> None:
+COMORBIDITY_BITS: Dict[str, int] = {
+    code: 1 << i
+    for i, code in enumerate((
+        "cardiac",
+        "hepatic",
+        "renal",
+        "autoimmune",
+        "malignancy",
+        "infection_risk",
+        "psychiatric",
+        "gi_dominant",
+    ))
+}
+
+LOGISTIC_BITS: Dict[str, int] = {
+    code: 1 << i
+    for i, code in enumerate(("limited_infusion_access", "time_off_work", "unstable_insurance"))
+}
+
+
+def encode_codes(codes: Iterable[str], bits: Dict[str, int]) -> int:
+    """OR together the bits of the selected option codes."""
+    mask = 0
+    for code in codes:
+        mask |= bits[code]
+    return mask
+
+
+# (risk_level, efficacy_preference) -> ((delta, note) for high/moderate-high tiers, (delta, note) for moderate/platform)
+_ACTIVITY_RULES: Dict[Tuple[str, str], Tuple[Tuple[float, Note], Tuple[float, Note]]] = {
+    **{
+        ("high", preference): ((3.0, Note.HIGH_RISK_HE), (1.0, Note.HIGH_RISK_LOWER_EFF))
+        for preference in ("max", "balanced", "safety")
+    },
+    # Low–moderate risk at onset
+    ("low_mod", "max"): ((3.0, Note.MAX_PREF_HE), (1.5, Note.MAX_PREF_LOWER_EFF)),
+    ("low_mod", "balanced"): ((2.5, Note.BALANCED_HE), (2.0, Note.BALANCED_LOWER_EFF)),
+    ("low_mod", "safety"): ((1.0, Note.SAFETY_HE), (3.0, Note.SAFETY_LOWER_EFF)),
+}
+
+# Pregnancy in 6–24 months: (score delta, note) per pregnancy-strategy code
+_PREG_LATER_RULES: Dict[int, Tuple[float, Note]] = {
+    PREG_COMPATIBLE: (3.0, Note.PREG_LATER_COMPATIBLE),
+    PREG_SHORT_COURSE: (2.0, Note.PREG_LATER_SHORT_COURSE),
+    PREG_CAUTION: (1.0, Note.PREG_LATER_CAUTION),
+    # needs_long_washout or avoid
+    PREG_LONG_WASHOUT: (-3.0, Note.PREG_LATER_WASHOUT),
+    PREG_AVOID: (-3.0, Note.PREG_LATER_WASHOUT),
+}
+
+# Comorbidity rule table, applied in order per DMT class:
+# (comorbidity code, affected DMT keys, score delta or None to exclude, note or exclusion reason, stop further rules)
+COMORBIDITY_RULES: Tuple[Tuple[str, FrozenSet[str], Optional[float], Union[Note, Reason], bool], ...] = (
+    # Cardiac disease – avoid S1P modulators
+    ("cardiac", frozenset({"s1p_modulators"}), None, Reason.CARDIAC_S1P, True),
+    # Significant hepatic disease – avoid teriflunomide; caution with others
+    ("hepatic", frozenset({"teriflunomide"}), None, Reason.HEPATIC_TERIFLUNOMIDE, True),
+    # Renal impairment – caution with fumarates
+    ("renal", frozenset({"fumarates"}), -2.0, Note.RENAL, False),
+    # Autoimmune diathesis – avoid alemtuzumab
+    ("autoimmune", frozenset({"alemtuzumab"}), None, Reason.AUTOIMMUNE_ALEMTUZUMAB, False),
+    # Malignancy history – caution with highly immunosuppressive drugs and teriflunomide
+    ("malignancy", frozenset({"anti_cd20", "alemtuzumab", "cladribine", "teriflunomide"}), -2.0, Note.MALIGNANCY, False),
+    # Serious or recurrent infections – caution/avoid deep immunosuppression
+    ("infection_risk", frozenset({"anti_cd20", "alemtuzumab", "cladribine", "s1p_modulators"}), -3.0, Note.INFECTION_RISK, False),
+    # Prominent baseline GI symptoms – avoid GI-heavy agents
+    ("gi_dominant", frozenset({"fumarates", "teriflunomide"}), -3.0, Note.GI_DOMINANT, False),
+    # Severe depression/suicidality – caution with interferons
+    ("psychiatric", frozenset({"platform_injectables"}), -2.0, Note.PSYCHIATRIC, False),
+)
+
+# Very high-cost biologics whose funding is at risk when insurance is unstable
+HIGH_COST_BIOLOGICS = frozenset({"anti_cd20", "natalizumab", "alemtuzumab"})
+
+
+class DMTStatic(NamedTuple):
+    """Column-wise (one entry per DMT class, in DMT_CLASSES order) view of the class metadata."""
+    keys: Tuple[str, ...]
+    tier_code: np.ndarray  # int8
+    tag_mask: np.ndarray  # uint32
+    preg_code: np.ndarray  # int8
+    preg_later_delta: np.ndarray  # float64, score delta when pregnancy is planned in 6–24 months
+    preg_later_notes_bits: np.ndarray  # uint64, matching note bit
+
+
+def _build_static() -> DMTStatic:
     """
-    Adjust scores based on baseline disease activity and the patient's risk/efficacy preference.
-    risk_level: 'high' or 'low_mod'
-    efficacy_preference: 'max', 'balanced', or 'safety'
+    Encode DMT_CLASSES into read-only arrays (read-only because the bundle is shared across sessions).
     """
-    for key, meta in DMT_CLASSES.items():
-        tier = meta["efficacy_tier"]
-        if risk_level == "high":
-            if tier in {"high", "moderate_high"}:
-                scores[key] += 3.0
-                notes[key].append("High-risk disease: high-efficacy or moderate-high-efficacy class is preferred.")
-            else:
-                scores[key] += 1.0
-                notes[key].append("High-risk disease: platform/moderate efficacy likely insufficient except when higher-efficacy options are unsafe.")
-        else:
-            # Low–moderate risk at onset
-            if efficacy_preference == "max":
-                if tier in {"high", "moderate_high"}:
-                    scores[key] += 3.0
-                    notes[key].append("Patient prefers maximal long-term efficacy; this class fits that stance.")
-                else:
-                    scores[key] += 1.5
-                    notes[key].append("Moderate/platform efficacy despite maximal-efficacy preference.")
-            elif efficacy_preference == "balanced":
-                if tier in {"high", "moderate_high"}:
-                    scores[key] += 2.5
-                    notes[key].append("Balanced view: high efficacy acceptable with monitoring.")
-                else:
-                    scores[key] += 2.0
-                    notes[key].append("Balanced view: moderate/platform efficacy acceptable.")
-            else:  # safety-first
-                if tier in {"high", "moderate_high"}:
-                    scores[key] += 1.0
-                    notes[key].append("Safety-first stance: high-efficacy agent used only if other factors strongly favour it.")
-                else:
-                    scores[key] += 3.0
-                    notes[key].append("Safety-first stance: platform/moderate efficacy aligns with risk aversion.")
+    keys = tuple(DMT_CLASSES)
+    tier_code = np.array([TIER_CODES[DMT_CLASSES[k].efficacy_tier] for k in keys], dtype=np.int8)
+    tag_mask = np.array([DMT_CLASSES[k].tag_mask for k in keys], dtype=np.uint32)
+    preg_code = np.array([PREG_CODES[DMT_CLASSES[k].pregnancy_strategy] for k in keys], dtype=np.int8)
+    preg_later_delta = np.array([_PREG_LATER_RULES[c][0] for c in preg_code])
+    preg_later_notes_bits = np.array([_NOTE_BITS[_PREG_LATER_RULES[c][1]] for c in preg_code], dtype=np.uint64)
+    arrays = (tier_code, tag_mask, preg_code, preg_later_delta, preg_later_notes_bits)
+    for arr in arrays:
+        arr.setflags(write=False)
+    return DMTStatic(keys, *arrays)
 
 
-def score_pregnancy(
-    pregnancy_horizon: str,
-    of_childbearing_potential: bool,
-    scores: Dict[str, float],
-    notes: Dict[str, List[str]],
-    excluded: Dict[str, str],
+def _apply_rule(
+    scores: np.ndarray,
+    notes_bits: np.ndarray,
+    mask: np.ndarray,
+    delta: float,
+    note: Note,
 ) -> None:
     """
-    pregnancy_horizon: 'none', 'within_6_months', 'six_to_24_months'
+    Add delta to every class selected by the boolean mask and set the note bit for each of them.
     """
-    if not of_childbearing_potential or pregnancy_horizon == "none":
-        return
-
-    for key, meta in DMT_CLASSES.items():
-        strategy = meta["pregnancy_strategy"]
-
-        if pregnancy_horizon == "within_6_months":
-            if strategy == "compatible":
-                scores[key] += 4.0
-                notes[key].append("Pregnancy planned in ≤6 months: this class is relatively compatible with conception/pregnancy.")
-            else:
-                excluded[key] = "Pregnancy planned in ≤6 months: not advisable because safe washout is not feasible or data are insufficient."
-        elif pregnancy_horizon == "six_to_24_months":
-            if strategy == "compatible":
-                scores[key] += 3.0
-                notes[key].append("Pregnancy in 6–24 months: relatively safe through conception.")
-            elif strategy == "short_course_before_preg":
-                scores[key] += 2.0
-                notes[key].append("Pregnancy in 6–24 months: can be used as short-course or with timed last dose before conception.")
-            elif strategy == "caution":
-                scores[key] += 1.0
-                notes[key].append("Pregnancy in 6–24 months: limited but growing data; typically not first-line in this setting.")
-            else:  # needs_long_washout or avoid
-                scores[key] -= 3.0
-                notes[key].append("Pregnancy in 6–24 months: long washout or teratogenicity makes this less attractive.")
-
-
-def score_comorbidities(
-    comorbidities: List[str],
-    scores: Dict[str, float],
-    notes: Dict[str, List[str]],
-    excluded: Dict[str, str],
+    scores += np.where(mask, delta, 0.0)
+    notes_bits[mask] |= _NOTE_BITS[note]
+
+
+def _exclude(
+    excluded_mask: np.ndarray,
+    excluded_reason: np.ndarray,
+    mask: np.ndarray,
+    reason: Reason,
 ) -> None:
-    """
-    comorbidities: list of codes such as 'cardiac', 'hepatic', 'renal', 'autoimmune', 'malignancy', 'infection_risk', 'psychiatric', 'gi_dominant'
-    """
-    for key, meta in DMT_CLASSES.items():
-        # Cardiac disease – avoid S1P modulators
-        if "cardiac" in comorbidities and key == "s1p_modulators":
-            excluded[key] = "Cardiac disease or conduction abnormalities: S1P modulators are relatively contraindicated."
-            continue
-
-        # Significant hepatic disease – avoid teriflunomide; caution with others
-        if "hepatic" in comorbidities and key == "teriflunomide":
-            excluded[key] = "Significant hepatic disease: teriflunomide carries hepatotoxicity risk."
-            continue
-
-        # Renal impairment – caution with fumarates
-        if "renal" in comorbidities and key == "fumarates":
-            scores[key] -= 2.0
-            notes[key].append("Renal impairment: fumarates have limited data and may be less attractive.")
-
-        # Autoimmune diathesis – avoid alemtuzumab
-        if "autoimmune" in comorbidities and key == "alemtuzumab":
-            excluded[key] = "Pre-existing autoimmune diathesis: avoid alemtuzumab because of high autoimmune complication rates."
-
-        # Malignancy history – caution with highly immunosuppressive drugs and teriflunomide
-        if "malignancy" in comorbidities and key in {"anti_cd20", "alemtuzumab", "cladribine", "teriflunomide"}:
-            scores[key] -= 2.0
-            notes[key].append("History of malignancy: consider carefully; balance immunosuppression against cancer risk.")
-
-        # Serious or recurrent infections – caution/avoid deep immunosuppression
-        if "infection_risk" in comorbidities and key in {"anti_cd20", "alemtuzumab", "cladribine", "s1p_modulators"}:
-            scores[key] -= 3.0
-            notes[key].append("High infection risk: deep or prolonged immunosuppression is less attractive.")
-
-        # Prominent baseline GI symptoms – avoid GI-heavy agents
-        if "gi_dominant" in comorbidities and key in {"fumarates", "teriflunomide"}:
-            scores[key] -= 3.0
-            notes[key].append("Prominent baseline GI symptoms: this class is often GI-limited and may be poorly tolerated.")
-
-        # Severe depression/suicidality – caution with interferons
-        if "psychiatric" in comorbidities and key == "platform_injectables":
-            scores[key] -= 2.0
-            notes[key].append("Severe depression or suicidality: interferon-associated mood effects make this less attractive.")
-
-
-def score_modifiers(
-    adherence_risk: bool,
+    """Exclude every class selected by the boolean mask, recording the reason (later reasons win)."""
+    excluded_mask |= mask
+    excluded_reason[mask] = reason
+
+
+# Route preferences offered on the RRMS form
+ROUTE_PREFERENCES: Tuple[str, ...] = ("no_strong_pref", "oral_only", "no_infusion", "prefer_infrequent")
+
+# scorer(pregnancy_horizon, of_childbearing_potential, comorbid_mask, adherence_risk, logistic_mask,
+#        vaccine_priority, forced_stop_risk) -> (scores, notes_bits, excluded_mask, excluded_reason)
+Scorer = Callable[[str, bool, int, bool, int, bool, bool], Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]
+
+
+def _build_specialized(
+    static: DMTStatic,
+    risk_level: str,
+    efficacy_preference: str,
     route_preference: str,
-    logistic_limits: List[str],
-    vaccine_priority: bool,
-    forced_stop_risk: bool,
-    scores: Dict[str, float],
-    notes: Dict[str, List[str]],
-    excluded: Dict[str, str],
-) -> None:
+) -> Scorer:
     """
-    route_preference: 'no_strong_pref', 'oral_only', 'no_infusion', 'prefer_infrequent'
-    logistic_limits: list including 'limited_infusion_access', 'time_off_work', 'unstable_insurance'
+    Partially evaluate the scoring rules for one (risk_level, efficacy_preference, route_preference)
+    combination. Everything that depends only on those axes and on DMTStatic (activity and route
+    deltas, modifier and comorbidity masks) is computed here once; the returned kernel applies the
+    remaining patient-specific rules.
+    risk_level: 'high' or 'low_mod'
+    efficacy_preference: 'max', 'balanced', or 'safety'
+    route_preference: one of ROUTE_PREFERENCES
+
+    The kernel returns (scores, notes_bits, excluded_mask, excluded_reason), all aligned to
+    static.keys; excluded_reason holds a Reason ID or -1.
     """
-    for key, meta in DMT_CLASSES.items():
-        tags = meta["tags"]
+    n = len(static.keys)
+    tag_mask = static.tag_mask
+    long_interval = (tag_mask & (LONG_INTERVAL | IMMUNE_RECON)) != 0
+    high_freq = (tag_mask & HIGH_FREQ) != 0
+    infusion = (tag_mask & INFUSION) != 0
+
+    # Baseline disease activity and risk/efficacy preference
+    (high_delta, high_note), (low_delta, low_note) = _ACTIVITY_RULES[(risk_level, efficacy_preference)]
+    high_or_mh = static.tier_code <= TIER_MOD_HIGH
+    base_scores = np.where(high_or_mh, high_delta, low_delta)
+    base_notes_bits = np.where(high_or_mh, _NOTE_BITS[high_note], _NOTE_BITS[low_note])
+
+    # Route preference; classes excluded by an oral-only preference skip the later modifiers
+    active = np.ones(n, dtype=bool)
+    if route_preference == "oral_only":
+        active = (tag_mask & ORAL) != 0
+        _apply_rule(base_scores, base_notes_bits, active, 2.0, Note.ORAL_ONLY)
+    elif route_preference == "no_infusion":
+        _apply_rule(base_scores, base_notes_bits, infusion, -3.0, Note.NO_INFUSION)
+    elif route_preference == "prefer_infrequent":
+        _apply_rule(base_scores, base_notes_bits, long_interval, 2.0, Note.INFREQUENT_LONG_INTERVAL)
+        _apply_rule(base_scores, base_notes_bits, high_freq, -1.0, Note.INFREQUENT_HIGH_FREQ)
+    route_excluded = ~active
+    # Shared by every session through the cached scorer table; kernels work on copies
+    base_scores.setflags(write=False)
+    base_notes_bits.setflags(write=False)
+
+    compatible = static.preg_code == PREG_COMPATIBLE
+    comorbidity_rules = [
+        (COMORBIDITY_BITS[code], np.array([k in affected for k in static.keys]), delta, note_or_reason, stop)
+        for code, affected, delta, note_or_reason, stop in COMORBIDITY_RULES
+    ]
+    active_infusion = active & infusion
+    active_high_cost = active & np.array([k in HIGH_COST_BIOLOGICS for k in static.keys])
+    active_blunts_vacc = active & ((tag_mask & BLUNTS_VACC) != 0)
+    active_vaccine_friendly = active & ((tag_mask & VACCINE_FRIENDLY) != 0)
+    active_rebound = active & ((tag_mask & REBOUND) != 0)
+    active_long_interval = active & long_interval
+
+    def kernel(
+        pregnancy_horizon: str,
+        of_childbearing_potential: bool,
+        comorbid_mask: int,
+        adherence_risk: bool,
+        logistic_mask: int,
+        vaccine_priority: bool,
+        forced_stop_risk: bool,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        scores = base_scores.copy()
+        notes_bits = base_notes_bits.copy()
+        excluded_mask = np.zeros(n, dtype=bool)
+        excluded_reason = np.full(n, -1, dtype=np.int8)
+
+        # Pregnancy planning
+        if of_childbearing_potential and pregnancy_horizon == "within_6_months":
+            _apply_rule(scores, notes_bits, compatible, 4.0, Note.PREG_SOON_COMPATIBLE)
+            _exclude(excluded_mask, excluded_reason, ~compatible, Reason.PREG_SOON)
+        elif of_childbearing_potential and pregnancy_horizon == "six_to_24_months":
+            scores += static.preg_later_delta
+            notes_bits |= static.preg_later_notes_bits
+
+        # Comorbidities; a stopping exclusion skips the remaining comorbidity rules for that class
+        if comorbid_mask:
+            live = np.ones(n, dtype=bool)
+            for bit, affected, delta, note_or_reason, stop in comorbidity_rules:
+                if not comorbid_mask & bit:
+                    continue
+                hit = live & affected
+                if delta is None:
+                    _exclude(excluded_mask, excluded_reason, hit, note_or_reason)
+                    if stop:
+                        live &= ~hit
+                else:
+                    _apply_rule(scores, notes_bits, hit, delta, note_or_reason)
 
         # Adherence risk – reward long-interval regimens, penalise high-frequency dosing
         if adherence_risk:
-            if "long_interval" in tags or "immune_reconstitution" in tags:
-                scores[key] += 2.5
-                notes[key].append("High adherence risk: long-interval or immune-reconstitution regimen is a good fit.")
-            if "high_freq" in tags:
-                scores[key] -= 2.0
-                notes[key].append("High adherence risk: frequent dosing may be problematic.")
-
-        # Route preference
-        if route_preference == "oral_only":
-            if "oral" in tags:
-                scores[key] += 2.0
-                notes[key].append("Oral-only preference: this class is oral.")
-            else:
-                excluded[key] = "Patient prefers oral-only therapy; this class is not oral."
-                continue
-        elif route_preference == "no_infusion":
-            if "infusion" in tags:
-                scores[key] -= 3.0
-                notes[key].append("Patient wishes to avoid infusions; this class is infusion-based.")
-        elif route_preference == "prefer_infrequent":
-            if "long_interval" in tags or "immune_reconstitution" in tags:
-                scores[key] += 2.0
-                notes[key].append("Prefers infrequent dosing: long-interval or immune-reconstitution class fits well.")
-            if "high_freq" in tags:
-                scores[key] -= 1.0
-                notes[key].append("Prefers infrequent dosing: daily or frequent dosing less attractive.")
+            _apply_rule(scores, notes_bits, long_interval, 2.5, Note.ADHERENCE_LONG_INTERVAL)
+            _apply_rule(scores, notes_bits, high_freq, -2.0, Note.ADHERENCE_HIGH_FREQ)
+
+        # Oral-only exclusion is applied last among exclusions so its reason wins, as before
+        _exclude(excluded_mask, excluded_reason, route_excluded, Reason.NOT_ORAL)
 
         # Logistic limitations – infusion access and insurance stability
-        if "limited_infusion_access" in logistic_limits and "infusion" in tags:
-            scores[key] -= 3.0
-            notes[key].append("Limited infusion access: hospital-based infusions are logistically difficult.")
-        if "time_off_work" in logistic_limits and "infusion" in tags:
-            scores[key] -= 2.0
-            notes[key].append("Difficulty taking time off work: prolonged infusions are less convenient.")
-        if "unstable_insurance" in logistic_limits and key in {"anti_cd20", "natalizumab", "alemtuzumab"}:
-            scores[key] -= 1.5
-            notes[key].append("Unstable insurance: very high-cost biologics may be at risk if coverage changes.")
+        if logistic_mask & LOGISTIC_BITS["limited_infusion_access"]:
+            _apply_rule(scores, notes_bits, active_infusion, -3.0, Note.LIMITED_INFUSION_ACCESS)
+        if logistic_mask & LOGISTIC_BITS["time_off_work"]:
+            _apply_rule(scores, notes_bits, active_infusion, -2.0, Note.TIME_OFF_WORK)
+        if logistic_mask & LOGISTIC_BITS["unstable_insurance"]:
+            _apply_rule(scores, notes_bits, active_high_cost, -1.5, Note.UNSTABLE_INSURANCE)
 
         # Vaccine priority – want preserved humoral responses
         if vaccine_priority:
-            if "blunts_vaccines" in tags:
-                scores[key] -= 3.0
-                notes[key].append("High vaccine-priority: this class markedly blunts humoral vaccine responses.")
-            if "vaccine_friendly" in tags:
-                scores[key] += 2.0
-                notes[key].append("High vaccine-priority: this class generally preserves vaccine responses.")
+            _apply_rule(scores, notes_bits, active_blunts_vacc, -3.0, Note.VACCINE_BLUNTS)
+            _apply_rule(scores, notes_bits, active_vaccine_friendly, 2.0, Note.VACCINE_FRIENDLY)
 
         # Forced-discontinuation risk – avoid rebound-prone classes
         if forced_stop_risk:
-            if "rebound_risk" in tags:
-                scores[key] -= 4.0
-                notes[key].append("High likelihood of forced discontinuation: rebound risk makes this class unattractive.")
-            if "long_interval" in tags or "immune_reconstitution" in tags:
-                scores[key] += 1.5
-                notes[key].append("High likelihood of forced discontinuation: this class usually has a smoother exit strategy.")
+            _apply_rule(scores, notes_bits, active_rebound, -4.0, Note.FORCED_STOP_REBOUND)
+            _apply_rule(scores, notes_bits, active_long_interval, 1.5, Note.FORCED_STOP_SMOOTH_EXIT)
+
+        return scores, notes_bits, excluded_mask, excluded_reason
+
+    return kernel
+
+
+def _script_version() -> int:
+    """
+    Modification time of this script. st.cache_resource and st.session_state outlive an edit to the
+    script, so state derived from DMT_CLASSES or the rules is tagged with this and dropped on a change.
+    """
+    return Path(__file__).stat().st_mtime_ns
+
+
+@st.cache_resource(max_entries=1)
+def _scoring_tables(script_version: int) -> Tuple[DMTStatic, Dict[Tuple[str, str, str], Scorer]]:
+    """
+    Per-process (not per-user) DMTStatic bundle plus one specialized kernel per
+    (risk_level, efficacy_preference, route_preference), shared by all sessions.
+    Call with _script_version() so an edited script rebuilds them.
+    """
+    static = _build_static()
+    scorers = {
+        (risk_level, efficacy_preference, route_preference): _build_specialized(
+            static, risk_level, efficacy_preference, route_preference
+        )
+        for risk_level, efficacy_preference in _ACTIVITY_RULES
+        for route_preference in ROUTE_PREFERENCES
+    }
+    return static, scorers
+
+
+class _DetailsView(Mapping):
+    """
+    Read-only mapping key -> { 'name', 'score', 'notes', 'excluded_reason' } over the raw scoring
+    arrays; each entry is formatted only when it is looked up.
+    """
+
+    def __init__(
+        self,
+        keys: Tuple[str, ...],
+        scores: np.ndarray,
+        notes_bits: np.ndarray,
+        excluded_reason: np.ndarray,
+    ) -> None:
+        self._index = {key: i for i, key in enumerate(keys)}
+        self._scores = scores
+        self._notes_bits = notes_bits
+        self._excluded_reason = excluded_reason
+
+    def __getitem__(self, key: str) -> Dict[str, str]:
+        i = self._index[key]
+        reason = self._excluded_reason[i]
+        return {
+            "name": DMT_CLASSES[key].name,
+            "score": f"{self._scores[i]:.1f}",
+            "notes": _note_text(int(self._notes_bits[i])),
+            "excluded_reason": _REASON_TEXT[reason] if reason >= 0 else "",
+        }
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
 
 
 def compute_rrms_initial_recommendations(
@@ -352,90 +622,273 @@ def compute_rrms_initial_recommendations(
     efficacy_preference: str,
     of_childbearing_potential: bool,
     pregnancy_horizon: str,
-    comorbidities: List[str],
+    comorbid_mask: int,
     adherence_risk: bool,
     route_preference: str,
-    logistic_limits: List[str],
+    logistic_mask: int,
     vaccine_priority: bool,
     forced_stop_risk: bool,
-) -> Tuple[List[str], List[str], Dict[str, Dict[str, str]]]:
+) -> Tuple[List[str], List[str], List[str], Mapping[str, Dict[str, str]]]:
     """
+    comorbid_mask / logistic_mask: OR of COMORBIDITY_BITS / LOGISTIC_BITS (see encode_codes)
+
     Returns:
       strongly_recommended: list of DMT keys
       reasonable_alternatives: list of DMT keys
+      excluded: list of excluded DMT keys, in DMT_CLASSES order
       details: mapping from key -> { 'name', 'score', 'notes', 'excluded_reason' }
     """
-    scores: Dict[str, float] = {k: 0.0 for k in DMT_CLASSES.keys()}
-    notes: Dict[str, List[str]] = {k: [] for k in DMT_CLASSES.keys()}
-    excluded: Dict[str, str] = {}
-
-    # Stepwise scoring
-    score_activity_and_efficacy(risk_level, efficacy_preference, scores, notes)
-    score_pregnancy(pregnancy_horizon, of_childbearing_potential, scores, notes, excluded)
-    score_comorbidities(comorbidities, scores, notes, excluded)
-    score_modifiers(
+    static, scorers = _scoring_tables(_script_version())
+    scorer = scorers[(risk_level, efficacy_preference, route_preference)]
+    scores, notes_bits, excluded_mask, excluded_reason = scorer(
+        pregnancy_horizon,
+        of_childbearing_potential,
+        comorbid_mask,
         adherence_risk,
-        route_preference,
-        logistic_limits,
+        logistic_mask,
         vaccine_priority,
         forced_stop_risk,
-        scores,
-        notes,
-        excluded,
     )
 
-    # Assemble details and rankings
-    details: Dict[str, Dict[str, str]] = {}
-    for key, meta in DMT_CLASSES.items():
-        details[key] = {
-            "name": meta["name"],
-            "score": f"{scores[key]:.1f}",
-            "notes": " ".join(notes[key]) if notes[key] else "",
-            "excluded_reason": excluded.get(key, ""),
-        }
+    # Details are formatted lazily, only for the classes the UI looks up
+    details = _DetailsView(static.keys, scores, notes_bits, excluded_reason)
+    excluded = [static.keys[i] for i in np.flatnonzero(excluded_mask)]
 
     # Determine ranking among non-excluded
-    non_excluded = [k for k in DMT_CLASSES.keys() if k not in excluded]
-    if not non_excluded:
-        return [], [], details
+    non_excluded = np.flatnonzero(~excluded_mask)
+    if not non_excluded.size:
+        return [], [], excluded, details
+
+    # Stable descending sort keeps DMT_CLASSES order among equal scores
+    order = non_excluded[np.argsort(-scores[non_excluded], kind="stable")]
+    ranked_scores = scores[order]
+    strong = ranked_scores >= ranked_scores[0] - 1.0
+    alternative = ~strong & (ranked_scores > 0)
+
+    strongly_recommended = [static.keys[i] for i in order[strong]]
+    reasonable_alternatives = [static.keys[i] for i in order[alternative]]
+    return strongly_recommended, reasonable_alternatives, excluded, details
+
+# ==========================
+# Static UI copy (RRMS page)
+# ==========================
+
+_RRMS_INTRO_MD = (
+    "This prototype implements the relapsing MS branch of your decision tree, including disease-activity "
+    "stratification, comorbidity and pregnancy filters, and the patient- and system-level modifiers (adherence, "
+    "route preference, logistics, vaccination, and exit strategy). It outputs DMT *classes* rather than individual "
+    "brands and is intended for clinician use only."
+)
+
+_DISCLAIMER_MD = (
+    "Research prototype only. This does not replace clinical judgement, local guidelines, product labels, or "
+    "patient preferences. Use at your own risk and always verify details independently."
+)
+
+_ALL_EXCLUDED_MD = (
+    "All candidate classes were excluded by the current constraints. "
+    "You may need to relax some inputs or consider off-tree approaches."
+)
+
+_RESULT_NOTES_MD = (
+    "• This tool reasons at the *class* level; individual products within a class may differ in label details, "
+    "monitoring, and real-world safety.\n"
+    "• The scoring system is heuristic and intended to mirror the decision tree rather than act as a "
+    "black-box recommendation engine.\n"
+    "• You can iteratively adjust inputs to see how changing priorities (for example, pregnancy horizon or route "
+    "preference) shifts the suggested classes."
+)
+
+# ======================================
+# Recommendation output (Markdown blocks)
+# ======================================
+
+def _merge_markdown_blocks(blocks: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """
+    Join runs of adjacent 'markdown' blocks into one, so each run is sent as a single delta.
+    """
+    merged: List[Tuple[str, str]] = []
+    for kind, text in blocks:
+        if kind == "markdown" and merged and merged[-1][0] == "markdown":
+            merged[-1] = ("markdown", merged[-1][1] + "\n\n" + text)
+        else:
+            merged.append((kind, text))
+    return merged
+
+
+def _render_dmt_card(meta: DMT, info: Mapping[str, object]) -> str:
+    """
+    One recommended class as a single Markdown block: bold heading with score, then the bullet list.
+    """
+    lines = [f"**{meta.name}** (score {info['score']})"]
+    if info["notes"]:
+        lines.append(f"- Rationale: {info['notes']}")
+    lines += [
+        f"- Efficacy tier: {meta.efficacy_tier}",
+        f"- Usual routes: {', '.join(meta.routes)}",
+        f"- Typical ARR reduction: {meta.arr_reduction}",
+        f"- Mechanism of action: {meta.moa}",
+        f"- Key risks: {meta.key_risks}",
+    ]
+    return "\n".join(lines)
 
-    max_score = max(scores[k] for k in non_excluded)
-    strongly_recommended: List[str] = []
-    reasonable_alternatives: List[str] = []
 
-    for key in sorted(non_excluded, key=lambda k: scores[k], reverse=True):
-        if scores[key] >= max_score - 1.0:
-            strongly_recommended.append(key)
-        elif scores[key] > 0:
-            reasonable_alternatives.append(key)
+def build_recs(
+    risk_level: str,
+    efficacy_preference: str,
+    of_childbearing_potential: bool,
+    pregnancy_horizon: str,
+    comorbid_mask: int,
+    adherence_risk: bool,
+    route_preference: str,
+    logistic_mask: int,
+    vaccine_priority: bool,
+    forced_stop_risk: bool,
+) -> List[Tuple[str, str]]:
+    """
+    Assemble the recommendation section as a list of (streamlit-kind, text) blocks.
+    The renderer replays them with getattr(st, kind)(text); no st.* calls happen here,
+    so the result can be kept in session state and replayed on later reruns.
+    """
+    strongly_rec, alternatives, excluded, details = compute_rrms_initial_recommendations(
+        risk_level=risk_level,
+        efficacy_preference=efficacy_preference,
+        of_childbearing_potential=of_childbearing_potential,
+        pregnancy_horizon=pregnancy_horizon,
+        comorbid_mask=comorbid_mask,
+        adherence_risk=adherence_risk,
+        route_preference=route_preference,
+        logistic_mask=logistic_mask,
+        vaccine_priority=vaccine_priority,
+        forced_stop_risk=forced_stop_risk,
+    )
+
+    blocks: List[Tuple[str, str]] = [("subheader", "Suggested DMT classes (for discussion, not prescription)")]
+    if not strongly_rec and not alternatives:
+        blocks.append(("error", _ALL_EXCLUDED_MD))
+        return blocks
+
+    if strongly_rec:
+        blocks.append(("markdown", "**Strongly favoured classes** (highest overall fit given inputs):"))
+        blocks.append(("markdown", "\n\n".join(_render_dmt_card(DMT_CLASSES[k], details[k]) for k in strongly_rec)))
+
+    if alternatives:
+        blocks.append(("markdown", "**Reasonable alternative classes** (fit is acceptable but not maximal):"))
+        blocks.append(("markdown", "\n\n".join(_render_dmt_card(DMT_CLASSES[k], details[k]) for k in alternatives)))
+
+    if excluded:
+        blocks.append(("subheader", "Classes generally discouraged or excluded for this patient"))
+        blocks.append((
+            "markdown",
+            "\n\n".join(
+                f"**{DMT_CLASSES[k].name}**\n- Reason: {details[k]['excluded_reason']}" for k in excluded
+            ),
+        ))
 
-    return strongly_recommended, reasonable_alternatives, details
+    blocks.append(("subheader", "Notes"))
+    blocks.append(("markdown", _RESULT_NOTES_MD))
+    return _merge_markdown_blocks(blocks)
 
 # ================================
 # Streamlit UI for RRMS initial
 # ================================
 
+# Widget option labels, built once at import rather than on every rerun
+_RISK_LABELS: Dict[str, str] = {
+    "high": "High-risk (aggressive inflammatory disease)",
+    "low_mod": "Low–moderate risk",
+}
+
+_EFFICACY_LABELS: Dict[str, str] = {
+    "max": "Maximise efficacy even with more risk/monitoring",
+    "balanced": "Balance efficacy and safety",
+    "safety": "Safety-first / minimise risk and monitoring burden",
+}
+
+_PREG_LABELS: Dict[str, str] = {
+    "within_6_months": "Actively trying or likely in the next 0–6 months",
+    "six_to_24_months": "Likely in the next 6–24 months",
+    "none": "No pregnancy plans in the next 2 years / completed family",
+}
+
+_ROUTE_LABELS: Dict[str, str] = {
+    "no_strong_pref": "No strong route preference",
+    "oral_only": "Strong preference for oral-only therapy (avoid injections/infusions)",
+    "no_infusion": "Wishes to avoid infusions (oral or self-injection acceptable)",
+    "prefer_infrequent": "Prefers infrequent dosing / 'set-and-forget' regimens",
+}
+
+COMORBIDITY_OPTIONS: Dict[str, str] = {
+    "cardiac": "Cardiac disease or conduction abnormalities",
+    "hepatic": "Significant hepatic disease",
+    "renal": "Moderate–severe renal impairment",
+    "autoimmune": "Autoimmune diathesis (ITP, thyroiditis, nephritis, etc.)",
+    "malignancy": "History of malignancy or high cancer risk",
+    "infection_risk": "High serious infection risk or uncontrolled chronic infections (HBV, TB, etc.)",
+    "psychiatric": "Severe depression / suicidality",
+    "gi_dominant": "Prominent baseline GI symptoms (IBS/IBD/chronic nausea)",
+}
+
+LOGISTIC_OPTIONS: Dict[str, str] = {
+    "limited_infusion_access": "Limited access to infusion centres / long travel distances",
+    "time_off_work": "Difficulty taking time off work for long visits",
+    "unstable_insurance": "Unstable insurance / concern about continued coverage for high-cost biologics",
+}
+
+_SEX_OPTIONS: Tuple[str, ...] = ("female", "male", "other")
+_RISK_KEYS: Tuple[str, ...] = tuple(_RISK_LABELS)
+_EFFICACY_KEYS: Tuple[str, ...] = tuple(_EFFICACY_LABELS)
+_PREG_KEYS: Tuple[str, ...] = tuple(_PREG_LABELS)
+_COMORBIDITY_KEYS: Tuple[str, ...] = tuple(COMORBIDITY_OPTIONS)
+_LOGISTIC_KEYS: Tuple[str, ...] = tuple(LOGISTIC_OPTIONS)
+
+# Form answers before the first submission; afterwards missing widget state is seeded from
+# st.session_state["last_answers"]. Each answer's widget is keyed "rrms_<answer name>".
+_DEFAULT_ANSWERS: Dict[str, object] = {
+    "risk_level": "high",
+    "efficacy_preference": "balanced",
+    "sex_at_birth": "female",
+    "of_childbearing_potential": True,
+    "pregnancy_horizon": "none",
+    "comorbidities": (),
+    "adherence_risk": False,
+    "route_preference": "no_strong_pref",
+    "logistic_limits": (),
+    "vaccine_priority": False,
+    "forced_stop_risk": False,
+}
+
+
+def _seed_form_state() -> None:
+    """
+    Give every form widget a value before it renders. Widgets Streamlit dropped (e.g. while the About
+    page was shown) come back with the last submitted answers, so the replayed result matches the form;
+    widgets that still hold state keep it, so a new submission is never overridden.
+    """
+    answers = dict(st.session_state.get("last_answers", _DEFAULT_ANSWERS))
+    if answers["sex_at_birth"] != "female":
+        # The checkbox was hidden, so its stored False is not an answer; keep the usual default
+        answers["of_childbearing_potential"] = _DEFAULT_ANSWERS["of_childbearing_potential"]
+    for name, value in answers.items():
+        # Multiselects hold lists; the stored answers keep them as tuples
+        st.session_state.setdefault(f"rrms_{name}", list(value) if isinstance(value, tuple) else value)
+
+
 def page_initial_rrms():
     st.header("Initial DMT selection for relapsing MS (RRMS / active SPMS / high-risk CIS)")
-    st.markdown(
-        "This prototype implements the relapsing MS branch of your decision tree, including disease-activity "
-        "stratification, comorbidity and pregnancy filters, and the patient- and system-level modifiers (adherence, "
-        "route preference, logistics, vaccination, and exit strategy). It outputs DMT *classes* rather than individual "
-        "brands and is intended for clinician use only."
-    )
+    st.markdown(_RRMS_INTRO_MD)
 
-    st.warning(
-        "Research prototype only. This does not replace clinical judgement, local guidelines, product labels, or "
-        "patient preferences. Use at your own risk and always verify details independently."
-    )
+    st.warning(_DISCLAIMER_MD)
+
+    _seed_form_state()
 
     with st.form("rrms_initial_form"):
         st.subheader("1. Disease activity and prognosis")
         risk_level = st.radio(
             "Overall disease activity / prognostic risk at onset",
-            options=["high", "low_mod"],
-            index=0,
-            format_func=lambda x: "High-risk (aggressive inflammatory disease)" if x == "high" else "Low–moderate risk",
+            options=_RISK_KEYS,
+            key="rrms_risk_level",
+            format_func=_RISK_LABELS.__getitem__,
             help=(
                 "High-risk typically means ≥2 relapses in 12 months, a severe relapse with incomplete recovery, "
                 "heavy lesion load or multiple Gd+ lesions, spinal/brainstem involvement, early disability, older "
@@ -445,227 +898,197 @@ def page_initial_rrms():
 
         efficacy_preference = st.radio(
             "Patient / clinician stance on efficacy vs safety",
-            options=["max", "balanced", "safety"],
-            index=1,
-            format_func=lambda x: {
-                "max": "Maximise efficacy even with more risk/monitoring",
-                "balanced": "Balance efficacy and safety",
-                "safety": "Safety-first / minimise risk and monitoring burden",
-            }[x],
+            options=_EFFICACY_KEYS,
+            key="rrms_efficacy_preference",
+            format_func=_EFFICACY_LABELS.__getitem__,
         )
 
         st.subheader("2. Pregnancy and fertility")
         sex_at_birth = st.selectbox(
             "Sex at birth",
-            options=["female", "male", "other"],
+            options=_SEX_OPTIONS,
+            key="rrms_sex_at_birth",
         )
         of_childbearing_potential = False
         if sex_at_birth == "female":
             of_childbearing_potential = st.checkbox(
-                "Patient is of childbearing potential (not post-menopausal / hysterectomy)", value=True
+                "Patient is of childbearing potential (not post-menopausal / hysterectomy)",
+                key="rrms_of_childbearing_potential",
             )
 
         pregnancy_horizon = "none"
         if of_childbearing_potential:
             pregnancy_horizon = st.radio(
                 "Pregnancy planning horizon",
-                options=["within_6_months", "six_to_24_months", "none"],
-                index=2,
-                format_func=lambda x: {
-                    "within_6_months": "Actively trying or likely in the next 0–6 months",
-                    "six_to_24_months": "Likely in the next 6–24 months",
-                    "none": "No pregnancy plans in the next 2 years / completed family",
-                }[x],
+                options=_PREG_KEYS,
+                key="rrms_pregnancy_horizon",
+                format_func=_PREG_LABELS.__getitem__,
             )
 
         st.subheader("3. Comorbidities and baseline symptom profile")
-        comorbidity_options = {
-            "cardiac": "Cardiac disease or conduction abnormalities",
-            "hepatic": "Significant hepatic disease",
-            "renal": "Moderate–severe renal impairment",
-            "autoimmune": "Autoimmune diathesis (ITP, thyroiditis, nephritis, etc.)",
-            "malignancy": "History of malignancy or high cancer risk",
-            "infection_risk": "High serious infection risk or uncontrolled chronic infections (HBV, TB, etc.)",
-            "psychiatric": "Severe depression / suicidality",
-            "gi_dominant": "Prominent baseline GI symptoms (IBS/IBD/chronic nausea)",
-        }
         selected_comorbidities_labels = st.multiselect(
             "Select any comorbidities or dominant symptom patterns that should influence DMT choice",
-            options=list(comorbidity_options.keys()),
-            format_func=lambda x: comorbidity_options[x],
+            options=_COMORBIDITY_KEYS,
+            key="rrms_comorbidities",
+            format_func=COMORBIDITY_OPTIONS.__getitem__,
         )
-        comorbidities = list(selected_comorbidities_labels)
+        comorbid_mask = encode_codes(selected_comorbidities_labels, COMORBIDITY_BITS)
 
         st.subheader("4. Adherence, route preference, and logistics")
         adherence_risk = st.checkbox(
             "High risk of poor adherence/persistence (cognitive issues, mood disorder, chaotic life, prior non-adherence)",
-            value=False,
+            key="rrms_adherence_risk",
         )
 
         route_preference = st.radio(
             "Route and dosing preference",
-            options=["no_strong_pref", "oral_only", "no_infusion", "prefer_infrequent"],
-            index=0,
-            format_func=lambda x: {
-                "no_strong_pref": "No strong route preference",
-                "oral_only": "Strong preference for oral-only therapy (avoid injections/infusions)",
-                "no_infusion": "Wishes to avoid infusions (oral or self-injection acceptable)",
-                "prefer_infrequent": "Prefers infrequent dosing / 'set-and-forget' regimens",
-            }[x],
+            options=ROUTE_PREFERENCES,
+            key="rrms_route_preference",
+            format_func=_ROUTE_LABELS.__getitem__,
         )
 
-        logistic_options = {
-            "limited_infusion_access": "Limited access to infusion centres / long travel distances",
-            "time_off_work": "Difficulty taking time off work for long visits",
-            "unstable_insurance": "Unstable insurance / concern about continued coverage for high-cost biologics",
-        }
         logistic_limits = st.multiselect(
             "System and logistical constraints",
-            options=list(logistic_options.keys()),
-            format_func=lambda x: logistic_options[x],
+            options=_LOGISTIC_KEYS,
+            key="rrms_logistic_limits",
+            format_func=LOGISTIC_OPTIONS.__getitem__,
         )
+        logistic_mask = encode_codes(logistic_limits, LOGISTIC_BITS)
 
         st.subheader("5. Vaccination and exit strategy")
         vaccine_priority = st.checkbox(
             "Preserving robust vaccine responses is a high priority (older age, cardiopulmonary disease, high exposure)",
-            value=False,
+            key="rrms_vaccine_priority",
         )
         forced_stop_risk = st.checkbox(
             "High likelihood of forced DMT discontinuation in the next 2–3 years "
             "(planned pregnancy, insurance loss, emigration, etc.)",
-            value=False,
+            key="rrms_forced_stop_risk",
         )
 
         submitted = st.form_submit_button("Run decision engine")
 
     if submitted:
-        strongly_rec, alternatives, details = compute_rrms_initial_recommendations(
-            risk_level=risk_level,
-            efficacy_preference=efficacy_preference,
-            of_childbearing_potential=of_childbearing_potential,
-            pregnancy_horizon=pregnancy_horizon,
-            comorbidities=comorbidities,
-            adherence_risk=adherence_risk,
-            route_preference=route_preference,
-            logistic_limits=logistic_limits,
-            vaccine_priority=vaccine_priority,
-            forced_stop_risk=forced_stop_risk,
+        st.session_state["last_answers"] = {
+            "risk_level": risk_level,
+            "efficacy_preference": efficacy_preference,
+            "sex_at_birth": sex_at_birth,
+            "of_childbearing_potential": of_childbearing_potential,
+            "pregnancy_horizon": pregnancy_horizon,
+            "comorbidities": tuple(selected_comorbidities_labels),
+            "adherence_risk": adherence_risk,
+            "route_preference": route_preference,
+            "logistic_limits": tuple(logistic_limits),
+            "vaccine_priority": vaccine_priority,
+            "forced_stop_risk": forced_stop_risk,
+        }
+        st.session_state["last_result"] = _script_version(), build_recs(
+            risk_level,
+            efficacy_preference,
+            of_childbearing_potential,
+            pregnancy_horizon,
+            comorbid_mask,
+            adherence_risk,
+            route_preference,
+            logistic_mask,
+            vaccine_priority,
+            forced_stop_risk,
         )
 
-        st.subheader("Suggested DMT classes (for discussion, not prescription)")
-        if not strongly_rec and not alternatives:
-            st.error(
-                "All candidate classes were excluded by the current constraints. "
-                "You may need to relax some inputs or consider off-tree approaches."
-            )
-            return
-
-        if strongly_rec:
-            st.markdown("**Strongly favoured classes** (highest overall fit given inputs):")
-            for key in strongly_rec:
-                meta = DMT_CLASSES[key]
-                info = details[key]
-                st.markdown(f"**{meta['name']}** (score {info['score']})")
-                if info["notes"]:
-                    st.markdown(f"- Rationale: {info['notes']}")
-                st.markdown(f"- Efficacy tier: {meta['efficacy_tier']}")
-                st.markdown(f"- Usual routes: {', '.join(meta['routes'])}")
-                st.markdown(f"- Typical ARR reduction: {meta['arr_reduction']}")
-                st.markdown(f"- Mechanism of action: {meta['moa']}")
-                st.markdown(f"- Key risks: {meta['key_risks']}")
-
-        if alternatives:
-            st.markdown("**Reasonable alternative classes** (fit is acceptable but not maximal):")
-            for key in alternatives:
-                meta = DMT_CLASSES[key]
-                info = details[key]
-                st.markdown(f"**{meta['name']}** (score {info['score']})")
-                if info["notes"]:
-                    st.markdown(f"- Rationale: {info['notes']}")
-                st.markdown(f"- Efficacy tier: {meta['efficacy_tier']}")
-                st.markdown(f"- Usual routes: {', '.join(meta['routes'])}")
-                st.markdown(f"- Typical ARR reduction: {meta['arr_reduction']}")
-                st.markdown(f"- Mechanism of action: {meta['moa']}")
-                st.markdown(f"- Key risks: {meta['key_risks']}")
-
-        excluded_any = [k for k in DMT_CLASSES.keys() if details[k]["excluded_reason"]]
-        if excluded_any:
-            st.subheader("Classes generally discouraged or excluded for this patient")
-            for key in excluded_any:
-                meta = DMT_CLASSES[key]
-                info = details[key]
-                st.markdown(f"**{meta['name']}**")
-                st.markdown(f"- Reason: {info['excluded_reason']}")
-
-        st.subheader("Notes")
-        st.markdown(
-            "• This tool reasons at the *class* level; individual products within a class may differ in label details, "
-            "monitoring, and real-world safety.\n"
-            "• The scoring system is heuristic and intended to mirror the decision tree rather than act as a "
-            "black-box recommendation engine.\n"
-            "• You can iteratively adjust inputs to see how changing priorities (for example, pregnancy horizon or route "
-            "preference) shifts the suggested classes."
-        )
+    # Replay the last submitted result, so navigating away and back does not lose it; cards rendered
+    # by an earlier version of this script are not replayed
+    last_result = st.session_state.get("last_result")
+    if last_result and last_result[0] == _script_version():
+        for kind, text in last_result[1]:
+            getattr(st, kind)(text)
 
 # ======================
 # About / DMT summary
 # ======================
 
+_ABOUT_INTRO_MD = (
+    "This Streamlit prototype encodes the relapsing MS portion of a decision tree for disease-modifying therapy "
+    "selection. It synthesises:\n\n"
+    "• Baseline disease activity and prognostic factors (high vs low–moderate risk).\n"
+    "• Comorbidities and contraindications (cardiac, hepatic, renal, autoimmune, malignancy, infection risk, "
+    "psychiatric comorbidity, GI-dominant symptoms).\n"
+    "• Pregnancy planning horizon and fertility considerations.\n"
+    "• Patient-centred modifiers: predicted adherence, route and dosing preferences, logistical constraints, "
+    "and risk of forced discontinuation.\n"
+    "• System-level modifiers: vaccine responsiveness priorities and rebound considerations.\n\n"
+    "The current version focuses on initial therapy choice in relapsing phenotypes (RRMS, high-risk CIS, active "
+    "SPMS). Escalation, switching, and progressive-phenotype modules can be layered on with similar rule-based "
+    "logic."
+)
+
+_PLANNED_EXTENSIONS_MD = (
+    "Future modules can incorporate:\n"
+    "• Escalation and switching logic for patients already on a DMT (handling breakthrough disease, "
+    "neutralising antibodies, PML risk, intolerable side effects, and pregnancy/systemic drivers).\n"
+    "• De-escalation and discontinuation decisions in older, long-stable patients, incorporating serum NfL and "
+    "MRI activity.\n"
+    "• Progressive phenotypes (PPMS, non-active SPMS) with appropriate restricted DMT options.\n"
+    "• More granular handling of individual products within each DMT class."
+)
+
+
+_ABOUT_TABLE_COLUMNS: Tuple[str, ...] = (
+    "Class", "Efficacy tier", "Routes", "Typical ARR reduction", "Mechanism", "Key risks",
+)
+
+
+def _about_class_summary_html() -> str:
+    """
+    The class summary as one escaped HTML table, so the About page emits a single element.
+    """
+    head = "".join(f"<th>{html.escape(col)}</th>" for col in _ABOUT_TABLE_COLUMNS)
+    rows = "".join(
+        "<tr>"
+        + "".join(
+            f"<td>{html.escape(cell)}</td>"
+            for cell in (
+                meta.name,
+                meta.efficacy_tier,
+                ", ".join(meta.routes),
+                meta.arr_reduction,
+                meta.moa,
+                meta.key_risks,
+            )
+        )
+        + "</tr>"
+        for meta in DMT_CLASSES.values()
+    )
+    return f"<table><thead><tr>{head}</tr></thead><tbody>{rows}</tbody></table>"
+
+
 def page_about():
     st.header("About this prototype")
-    st.markdown(
-        "This Streamlit prototype encodes the relapsing MS portion of a decision tree for disease-modifying therapy "
-        "selection. It synthesises:\n\n"
-        "• Baseline disease activity and prognostic factors (high vs low–moderate risk).\n"
-        "• Comorbidities and contraindications (cardiac, hepatic, renal, autoimmune, malignancy, infection risk, "
-        "psychiatric comorbidity, GI-dominant symptoms).\n"
-        "• Pregnancy planning horizon and fertility considerations.\n"
-        "• Patient-centred modifiers: predicted adherence, route and dosing preferences, logistical constraints, "
-        "and risk of forced discontinuation.\n"
-        "• System-level modifiers: vaccine responsiveness priorities and rebound considerations.\n\n"
-        "The current version focuses on initial therapy choice in relapsing phenotypes (RRMS, high-risk CIS, active "
-        "SPMS). Escalation, switching, and progressive-phenotype modules can be layered on with similar rule-based "
-        "logic."
-    )
+    st.markdown(_ABOUT_INTRO_MD)
 
     st.subheader("High-level class summary")
-    for key, meta in DMT_CLASSES.items():
-        st.markdown(f"**{meta['name']}**")
-        st.markdown(f"- Efficacy tier: {meta['efficacy_tier']}")
-        st.markdown(f"- Routes: {', '.join(meta['routes'])}")
-        st.markdown(f"- Typical ARR reduction: {meta['arr_reduction']}")
-        st.markdown(f"- Mechanism: {meta['moa']}")
-        st.markdown(f"- Key risks: {meta['key_risks']}")
-        st.markdown("")
+    st.markdown(_about_class_summary_html(), unsafe_allow_html=True)
 
     st.subheader("Planned extensions")
-    st.markdown(
-        "Future modules can incorporate:\n"
-        "• Escalation and switching logic for patients already on a DMT (handling breakthrough disease, "
-        "neutralising antibodies, PML risk, intolerable side effects, and pregnancy/systemic drivers).\n"
-        "• De-escalation and discontinuation decisions in older, long-stable patients, incorporating serum NfL and "
-        "MRI activity.\n"
-        "• Progressive phenotypes (PPMS, non-active SPMS) with appropriate restricted DMT options.\n"
-        "• More granular handling of individual products within each DMT class."
-    )
+    st.markdown(_PLANNED_EXTENSIONS_MD)
 
 # ============
 # Main app
 # ============
 
+_PAGES: Dict[str, Callable[[], None]] = {
+    "Initial DMT choice (relapsing MS)": page_initial_rrms,
+    "About / DMT summary": page_about,
+}
+_PAGE_LABELS: Tuple[str, ...] = tuple(_PAGES)
+
+
 def main():
     st.set_page_config(page_title="MS DMT decision support (relapsing MS prototype)", layout="wide")
     st.title("MS DMT decision support – relapsing MS prototype")
 
-    page = st.sidebar.radio(
-        "Choose a module",
-        options=["Initial DMT choice (relapsing MS)", "About / DMT summary"],
-    )
+    st.sidebar.radio("Choose a module", options=_PAGE_LABELS, key="page")
 
-    if page == "Initial DMT choice (relapsing MS)":
-        page_initial_rrms()
-    else:
-        page_about()
+    _PAGES[st.session_state.page]()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,83 @@
+from pathlib import Path
+
+from streamlit.testing.v1 import AppTest
+
+APP = str(Path(__file__).resolve().parents[1] / "streamlit_app.py")
+
+
+def _run_app() -> AppTest:
+    at = AppTest.from_file(APP, default_timeout=30).run()
+    assert not at.exception
+    return at
+
+
+def _widget(widgets, key):
+    return next(w for w in widgets if w.key == key)
+
+
+def _submit(at: AppTest) -> None:
+    at.button[0].click().run()
+    assert not at.exception
+
+
+def _switch_page(at: AppTest, index: int) -> None:
+    radio = at.sidebar.radio[0]
+    radio.set_value(radio.options[index]).run()
+    assert not at.exception
+
+
+def test_resubmit_uses_changed_answers():
+    at = _run_app()
+    _widget(at.radio, "rrms_risk_level").set_value("low_mod")
+    _widget(at.multiselect, "rrms_comorbidities").set_value(["cardiac"])
+    _submit(at)
+    assert at.session_state["last_answers"]["risk_level"] == "low_mod"
+
+    _widget(at.radio, "rrms_risk_level").set_value("high")
+    _widget(at.multiselect, "rrms_comorbidities").set_value(["hepatic"])
+    _submit(at)
+    answers = at.session_state["last_answers"]
+    assert answers["risk_level"] == "high"
+    assert answers["comorbidities"] == ("hepatic",)
+    assert "S1P modulators are relatively contraindicated" not in "".join(m.value for m in at.markdown)
+
+
+def test_resubmit_uses_changed_pregnancy_horizon():
+    at = _run_app()
+    _widget(at.radio, "rrms_pregnancy_horizon").set_value("within_6_months")
+    _submit(at)
+    assert at.session_state["last_answers"]["pregnancy_horizon"] == "within_6_months"
+
+    _widget(at.radio, "rrms_pregnancy_horizon").set_value("none")
+    _submit(at)
+    assert at.session_state["last_answers"]["pregnancy_horizon"] == "none"
+
+
+def test_form_and_result_survive_page_switch():
+    at = _run_app()
+    _widget(at.radio, "rrms_risk_level").set_value("low_mod")
+    _widget(at.radio, "rrms_route_preference").set_value("oral_only")
+    _widget(at.multiselect, "rrms_comorbidities").set_value(["cardiac"])
+    _submit(at)
+    result = [m.value for m in at.markdown]
+
+    _switch_page(at, 1)
+    _switch_page(at, 0)
+    assert _widget(at.radio, "rrms_risk_level").value == "low_mod"
+    assert _widget(at.radio, "rrms_route_preference").value == "oral_only"
+    assert _widget(at.multiselect, "rrms_comorbidities").value == ["cardiac"]
+    assert [m.value for m in at.markdown] == result
+
+
+def test_childbearing_defaults_to_true_after_male_submission():
+    at = _run_app()
+    _widget(at.selectbox, "rrms_sex_at_birth").set_value("male")
+    _submit(at)
+    assert at.session_state["last_answers"]["of_childbearing_potential"] is False
+
+    _widget(at.selectbox, "rrms_sex_at_birth").set_value("female")
+    _submit(at)
+    answers = at.session_state["last_answers"]
+    assert answers["sex_at_birth"] == "female"
+    assert answers["of_childbearing_potential"] is True
+    assert _widget(at.checkbox, "rrms_of_childbearing_potential").value is True